@@ -3,23 +3,33 @@ from dateutil.relativedelta import relativedelta
 import re
 import time
 import json
+import csv
 import warnings
-import pandas as pd
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
-import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.keys import Keys
 import subprocess
 import threading
+import queue
+import atexit
 import os
+import functools
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image, ImageTk
 
 warnings.filterwarnings("ignore")
 
+# lxml is a C parser and much faster on large review pages; fall back to the stdlib parser if missing
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
 # -------------------- Load Config ---------------------
 with open("config.json", "r") as f:
     CONFIG = json.load(f)
@@ -27,14 +37,31 @@ with open("config.json", "r") as f:
 AMAZON_EMAIL = CONFIG.get("AMAZON_EMAIL", "")
 AMAZON_PASSWORD = CONFIG.get("AMAZON_PASSWORD", "")
 CSV_FILE = CONFIG["csv_file"]
+PARQUET_FILE = CSV_FILE.rsplit(".", 1)[0] + ".parquet"
 MAX_PAGES = CONFIG["max_pages"]
 REVIEW_COLUMN_NAME = CONFIG["review_column_name"]
 COLUMNS_TO_ANALYZE = CONFIG.get("columns_to_analyze", [])
 GEMINI_PATH = CONFIG.get("gemini_path")
+GEMINI_API_KEY = CONFIG.get("gemini_api_key") or os.environ.get("GEMINI_API_KEY")
+GEMINI_MODEL = CONFIG.get("gemini_model", "gemini-2.5-flash")
 HEADLESS = CONFIG.get("headless", False)
+GEMINI_CHUNK_SIZE = CONFIG.get("gemini_chunk_size", 200)
+GEMINI_WORKERS = CONFIG.get("gemini_workers", 4)
+MAX_PROMPT_CHARS = CONFIG.get("max_prompt_chars", 32000)  # review text per Gemini call
+GEMINI_CACHE_DIR = CONFIG.get("gemini_cache_dir", ".gemini_cache")
+PAGE_THROTTLE = CONFIG.get("page_throttle", 0.2)  # politeness pause (s) before each page turn
+REVIEW_FIELDS = ["product_name", "overall_rating", "total_ratings", "reviewer_name", "star_rating",
+                 "review_date", "review_body"]
+# Same few values on every row of a scrape: stored as int codes + a small dictionary when read back
+CATEGORY_FIELDS = {"product_name", "overall_rating", "total_ratings", "star_rating"}
 
 driver = None
+_driver_lock = threading.Lock()
+_run_lock = threading.Lock()  # held by the submit worker for a whole scrape + analysis run
+_gemini_client = None  # None = not tried yet, False = SDK/key unavailable
+_gemini_lock = threading.Lock()
 output_box = None
+_log_queue = queue.Queue()
 gemini_output = {}
 product_rating_info = {"rating": "N/A", "total_ratings": "N/A"}
 progress_var = None
@@ -42,46 +69,227 @@ chat_progress_running = False
 chat_progress_value = 70.0
 chat_progress_direction = 1
 
+# -------------------- Regex Patterns ---------------------
+# Compiled once at import; these run per search result, per review and per Gemini output line
+_RE_NONALNUM = re.compile(r"[^a-zA-Z0-9\s]")
+# ASIN after /dp/, /gp/product/ or asin=; only if none, a whole 10-char path segment (the last one wins)
+_RE_ASIN = re.compile(r"(?:/(?:dp|gp/product)/|asin=)([A-Z0-9]{10})")
+_RE_ASIN_SEG = re.compile(r"(?<![^/])([A-Z0-9]{10})(?![^/])")
+_RE_MONTH_YEAR = re.compile(r"^[A-Za-z]{3}, \d{4}$")
+# A Gemini section header line (markdown bullets/headings/bold, "1." or "2)" numbering allowed),
+# ending in ':', '-', '–', '—' or end of line
+_RE_SECTION_HEADER = re.compile(
+    r"^[ \t>#*\-\d.)]*"
+    r"(overall impression|(?:summary of )?(?:positives?|negatives?)(?: feedbacks?)?(?: summary)?)\b"
+    r"[ \t*#]*(?:[:\-–—][ \t*]*|$)",
+    re.I | re.M)
+_RE_POSITIVE = re.compile(r"positive", re.I)
+_RE_NEGATIVE = re.compile(r"negative", re.I)
+_RE_NUM = re.compile(r"(\d{1,3}(?:[,\d]{0,})%?|\d+%?)")
+_RE_NUM_ANY = re.compile(r"(\d[\d,]*%?)")
+_RE_SENTIMENT = re.compile(r"(?P<pos>check|tick|✔|green|#067D62)|(?P<neg>minus|−|–|orange|negative|#f09300)", re.I)
+_RE_PAGINATION_LABEL = re.compile(r"^(?:[0-9]+|Next)$", re.I)
+
+# -------------------- Soup Strainers ---------------------
+# Build only the subtrees a page parse actually reads; everything else is skipped while parsing
+FLIPKART_LINKS_STRAINER = SoupStrainer("a", href=True)
+FLIPKART_CATEGORY_STRAINER = SoupStrainer(["text", "div"], class_=["_2DdnFS", "SmC0g8"])
+
 
 # -------------------- Helper Functions ---------------------
-def safe_text(tag):
-    return tag.text.strip() if tag else ""
+# Deletes the same ASCII characters _RE_NONALNUM does, in one C-level pass
+_ASCII_NONALNUM_TABLE = str.maketrans("", "", "".join(
+    chr(c) for c in range(128) if not (chr(c).isalnum() or chr(c).isspace())))
 
 
 def clean_text(text: str) -> str:
-    return re.sub(r"[^a-zA-Z0-9\s]", "", text).lower().strip()
+    if text.isascii():
+        return text.translate(_ASCII_NONALNUM_TABLE).lower().strip()
+    return _RE_NONALNUM.sub("", text).lower().strip()
+
+
+def matching_title_indexes(titles, query):
+    """Return indexes of titles containing the cleaned query, cleaned and matched in one vectorized pass."""
+    import pandas as pd  # deferred: pandas/NumPy import would delay the window appearing
+    if not titles:
+        return []
+    needle = clean_text(query)
+    cleaned = pd.Series(titles, dtype=object).str.replace(_RE_NONALNUM, "", regex=True).str.lower()
+    mask = cleaned.str.contains(needle, regex=False)
+    return mask[mask].index.tolist()
 
 
 def safe_print(*args, **kwargs):
     text = " ".join([str(a) for a in args])
     print(text, **kwargs)
-    global output_box
-    if output_box:
+    # Worker threads must not touch Tk; drain_log_queue() flushes this on the UI thread
+    _log_queue.put(text)
+
+
+def flush_log_queue():
+    """Insert all pending log lines into the output box in one widget update (Tk thread only)."""
+    lines = []
+    while True:
+        try:
+            lines.append(_log_queue.get_nowait())
+        except queue.Empty:
+            break
+    if lines and output_box:
         output_box.config(state="normal")
-        output_box.insert(tk.END, text + "\n")
+        output_box.insert(tk.END, "\n".join(lines) + "\n")
         output_box.see(tk.END)
         output_box.config(state="disabled")
 
 
+def drain_log_queue():
+    flush_log_queue()
+    root.after(100, drain_log_queue)
+
+
+def review_csv_writer(f):
+    """Start a review CSV on an open file: rows are streamed page by page instead of held in memory."""
+    writer = csv.DictWriter(f, fieldnames=REVIEW_FIELDS)
+    writer.writeheader()
+    return writer
+
+
+def current_soup(driver, parse_only=None):
+    """Parse the current page once (optionally only what a SoupStrainer keeps); callers reuse the soup."""
+    return BeautifulSoup(driver.page_source, HTML_PARSER, parse_only=parse_only)
+
+
+def wait_ready(selector, t=8):
+    """Wait until an element matching the CSS selector is present; returns it, or None on timeout."""
+    try:
+        return WebDriverWait(driver, t).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, selector))
+        )
+    except Exception:
+        return None
+
+
+def wait_stale(element, t=10) -> bool:
+    """Wait until a previously located element is detached from the DOM (page/list replaced)."""
+    try:
+        WebDriverWait(driver, t).until(EC.staleness_of(element))
+        return True
+    except Exception:
+        return False
+
+
+def animate_progress(start, end, delay=50):
+    """Step the progress bar from start to end on the Tk event loop instead of sleeping."""
+    progress_var.set(start)
+    if start < end:
+        root.after(delay, animate_progress, start + 1, end, delay)
+
+
 def extract_asin(product_url: str) -> str | None:
-    m = re.search(r"/(?:dp|gp/product)/([A-Z0-9]{10})", product_url)
+    m = _RE_ASIN.search(product_url)
     if m:
         return m.group(1)
-    m2 = re.search(r"asin=([A-Z0-9]{10})", product_url)
-    if m2:
-        return m2.group(1)
-    segments = product_url.split("/")
-    for seg in reversed(segments):
-        if re.match(r"^[A-Z0-9]{10}$", seg):
-            return seg
+    segments = _RE_ASIN_SEG.findall(product_url)
+    if segments:
+        return segments[-1]
     safe_print(f"[DEBUG] Could not extract ASIN from URL: {product_url}")
     return None
 
 
+def review_dtypes(columns):
+    """Explicit read dtypes so pandas skips inference: categorical for repeated values, string otherwise."""
+    return {col: ("category" if col in CATEGORY_FIELDS else "string") for col in columns}
+
+
+# pandas.read_csv's default na_values: the CSV path reads these (e.g. the scrapers' "N/A") back as NA,
+# so the Parquet copy stores them as nulls to give readers the same rows either way
+_CSV_NA_VALUES = frozenset([
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+])
+
+
+class ReviewParquetWriter:
+    """
+    Mirrors the review CSV as zstd Parquet, one row group per scraped page, so later reads can load just
+    the columns they need. A no-op when pyarrow is missing or a write fails (readers then use the CSV).
+    Enter it before opening the CSV so it closes last and its mtime marks it as fresh.
+    """
+
+    def __init__(self):
+        self._writer = None
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            safe_print("[INFO] pyarrow not installed, skipping Parquet copy of reviews.")
+            return
+        self._pa = pa
+        self._schema = pa.schema([
+            (col, pa.dictionary(pa.int32(), pa.string()) if col in CATEGORY_FIELDS else pa.string())
+            for col in REVIEW_FIELDS])
+        try:
+            self._writer = pq.ParquetWriter(PARQUET_FILE, self._schema, compression="zstd")
+        except Exception as e:
+            safe_print(f"[WARN] Could not write {PARQUET_FILE}: {e}")
+
+    def write_page(self, rows):
+        if self._writer is None or not rows:
+            return
+        try:
+            columns = {col: [None if row[col] in _CSV_NA_VALUES else row[col] for row in rows]
+                       for col in REVIEW_FIELDS}
+            self._writer.write_table(self._pa.Table.from_pydict(columns, schema=self._schema))
+        except Exception as e:
+            safe_print(f"[WARN] Could not write {PARQUET_FILE}: {e}")
+            self._abandon()
+
+    def _abandon(self):
+        # a partial file would look fresh to parquet_is_fresh(), so drop it
+        try:
+            self._writer.close()
+            os.remove(PARQUET_FILE)
+        except Exception:
+            pass
+        self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def parquet_is_fresh() -> bool:
+    """True when the Parquet copy exists and was written after the current CSV."""
+    try:
+        return os.path.getmtime(PARQUET_FILE) >= os.path.getmtime(CSV_FILE)
+    except OSError:
+        return False
+
+
+def read_review_columns(columns):
+    """Read only the given (present) review columns: from Parquet if fresh, else CSV via the Arrow engine."""
+    import pandas as pd
+    if parquet_is_fresh():
+        return pd.read_parquet(PARQUET_FILE, columns=[col for col in REVIEW_FIELDS if col in columns])
+    header = pd.read_csv(CSV_FILE, encoding="utf-8-sig", nrows=0).columns
+    present = [col for col in header if col in columns]
+    kwargs = {"encoding": "utf-8-sig", "usecols": present, "dtype": review_dtypes(present)}
+    try:
+        return pd.read_csv(CSV_FILE, engine="pyarrow", **kwargs)
+    except (ImportError, ValueError, NotImplementedError):
+        # no pyarrow, an option the engine rejects, or an Arrow parse error (ArrowInvalid is a ValueError),
+        # e.g. on quoted newlines inside review_body
+        return pd.read_csv(CSV_FILE, engine="c", **kwargs)
+
+
 def get_review_date_range():
     """Parse review_date column in CSV and return oldest & newest dates."""
+    import pandas as pd
     try:
-        df = pd.read_csv(CSV_FILE, encoding="utf-8-sig")
+        df = read_review_columns(["review_date"])
         parsed_dates = []
 
         for d in df['review_date'].dropna():
@@ -96,7 +304,7 @@ def get_review_date_range():
                     continue
 
             # Flipkart exact month/year
-            elif re.match(r"^[A-Za-z]{3}, \d{4}$", d):
+            elif _RE_MONTH_YEAR.match(d):
                 try:
                     parsed_dates.append(pd.to_datetime(d, format="%b, %Y"))
                 except:
@@ -127,7 +335,38 @@ def get_review_date_range():
 
 
 # -------------------- Gemini CLI ---------------------
-def call_gemini(prompt: str) -> str:
+def _get_gemini_client():
+    """Create the in-process google-genai client once; returns None when no API key or SDK is available."""
+    global _gemini_client
+    with _gemini_lock:
+        if _gemini_client is None:
+            _gemini_client = False
+            if GEMINI_API_KEY:
+                try:
+                    from google import genai
+                    _gemini_client = genai.Client(api_key=GEMINI_API_KEY)
+                    safe_print(f"[INFO] Using Gemini SDK ({GEMINI_MODEL}) instead of the CLI.")
+                except ImportError:
+                    safe_print("[INFO] google-genai not installed, using the Gemini CLI.")
+                except Exception as e:
+                    safe_print(f"[WARN] Could not set up the Gemini SDK client ({e}), using the Gemini CLI.")
+        return _gemini_client or None
+
+
+class _GeminiError(Exception):
+    """A failed Gemini call; raised so lru_cache and the disk cache never store error text."""
+
+
+def _call_gemini_uncached(prompt: str) -> str:
+    # Preferred: a persistent SDK client, which avoids spawning a CLI process per call
+    client = _get_gemini_client()
+    if client is not None:
+        try:
+            response = client.models.generate_content(model=GEMINI_MODEL, contents=prompt)
+            return (response.text or "").strip()
+        except Exception as e:
+            raise _GeminiError(f"Error: {e}")
+
     try:
         result = subprocess.run(
             [GEMINI_PATH],
@@ -137,38 +376,139 @@ def call_gemini(prompt: str) -> str:
             encoding='utf-8',
             errors='replace'
         )
-        if result.returncode == 0:
-            return result.stdout.strip()
-        else:
-            return f"Error: {result.stderr.strip()}"
     except Exception as e:
-        return f"CLI call failed: {e}"
+        raise _GeminiError(f"CLI call failed: {e}")
+    if result.returncode == 0:
+        return result.stdout.strip()
+    raise _GeminiError(f"Error: {result.stderr.strip()}")
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_gemini(prompt: str) -> str:
+    # Key includes the CLI path and model so a config change never serves stale answers
+    key_source = f"{GEMINI_PATH}|{GEMINI_MODEL}\0{prompt}"
+    key = hashlib.blake2b(key_source.encode("utf-8"), digest_size=16).hexdigest()
+    cache_path = os.path.join(GEMINI_CACHE_DIR, key)
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        pass
+
+    response = _call_gemini_uncached(prompt)
+    try:
+        os.makedirs(GEMINI_CACHE_DIR, exist_ok=True)
+        with open(cache_path, "w", encoding="utf-8") as f:
+            f.write(response)
+    except OSError as e:
+        safe_print(f"[WARN] Could not cache Gemini response: {e}")
+    return response
+
+
+def call_gemini(prompt: str) -> str:
+    """Run a prompt through Gemini, reusing in-memory and on-disk answers for identical prompts."""
+    try:
+        return _cached_gemini(prompt)
+    except _GeminiError as e:
+        return str(e)
+
+
+def budget_chunks(texts, max_items, max_chars):
+    """Group texts into consecutive chunks of at most max_items entries and about max_chars characters."""
+    chunks, current, used = [], [], 0
+    for text in texts:
+        text = text[:max_chars]  # one oversized review is truncated rather than dropped
+        if current and (len(current) >= max_items or used + len(text) + 1 > max_chars):
+            chunks.append(current)
+            current, used = [], 0
+        current.append(text)
+        used += len(text) + 1
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def split_sections_by_keyword(output):
+    """Fallback for unrecognised header shapes: any line mentioning a section keyword starts that section."""
+    pairs = []
+    for line in output.splitlines():
+        low = line.lower()
+        if "overall impression" in low or "positive" in low or "negative" in low:
+            pairs.append([low, line.replace("*", "").partition(":")[2]])
+        elif pairs:
+            pairs[-1][1] += "\n" + line
+    return pairs
+
+
+def summarize_review_chunk(chunk):
+    """Map step: condense one chunk of formatted reviews; returns (summary, None) or (None, error message)."""
+    prompt = f"""
+        Summarize the following product reviews briefly.
+        List the main positive points and the main negative points.
+
+        Reviews Data:
+        {' '.join(chunk)}
+        """
+    try:
+        return _cached_gemini(prompt), None
+    except _GeminiError as e:
+        return None, str(e)
 
 
 def analyze_reviews_with_gemini(progress_start=80, progress_end=100):
+    import pandas as pd
     global gemini_output
     try:
-        df = pd.read_csv(CSV_FILE, encoding="utf-8-sig")
-
         # Get all columns to analyze (including review_body)
         all_columns = COLUMNS_TO_ANALYZE + [REVIEW_COLUMN_NAME]
         safe_print(f"[INFO] Analyzing columns: {all_columns}")
 
-        # Create formatted data for each review
+        # Create formatted data for each review, reading only the needed columns a chunk at a time
         formatted_reviews = []
-        for idx, row in df.iterrows():
-            review_data = []
-            for col in all_columns:
-                if col in df.columns and pd.notna(row[col]):
-                    review_data.append(f"{col}: {row[col]}")
+        if parquet_is_fresh():
+            chunks = [read_review_columns(all_columns)]
+        else:
+            chunks = pd.read_csv(CSV_FILE, encoding="utf-8-sig", usecols=lambda c: c in all_columns,
+                                 dtype=review_dtypes(all_columns), chunksize=10000)
+        for chunk in chunks:
+            cols = [col for col in all_columns if col in chunk.columns]
+            for idx, values in zip(chunk.index, chunk[cols].itertuples(index=False, name=None)):
+                review_data = [f"{col}: {val}" for col, val in zip(cols, values) if pd.notna(val)]
 
-            if review_data:  # Only add if there's data
-                formatted_reviews.append(f"Review {idx + 1}:\n" + "\n".join(review_data))
+                if review_data:  # Only add if there's data
+                    formatted_reviews.append(f"Review {idx + 1}:\n" + "\n".join(review_data))
 
         safe_print(f"[INFO] Collected {len(formatted_reviews)} reviews from CSV for analysis...")
 
+        # Chunks are bounded by review count and prompt size, so no single call grows with the review count
+        chunks = budget_chunks(formatted_reviews, GEMINI_CHUNK_SIZE, MAX_PROMPT_CHARS)
+        if len(chunks) <= 1:
+            header = "Summarize the following product reviews with all their details."
+            reviews_text = ' '.join(chunks[0] if chunks else [])
+        else:
+            # Large review sets: summarize bounded chunks in parallel, then combine the partial summaries
+            safe_print(f"[INFO] Summarizing {len(chunks)} chunks of up to {GEMINI_CHUNK_SIZE} reviews...")
+            partials = []
+            with ThreadPoolExecutor(max_workers=GEMINI_WORKERS) as ex:
+                for i, (partial, error) in enumerate(ex.map(summarize_review_chunk, chunks), start=1):
+                    if error is not None:
+                        safe_print(f"[WARN] Gemini chunk {i}/{len(chunks)} failed: {error}")
+                        continue
+                    safe_print(f"[INFO] Gemini chunk {i}/{len(chunks)} summarized.")
+                    partials.append(partial)
+            if not partials:
+                safe_print("[ERROR] Gemini analysis failed: every review chunk failed to summarize.")
+                return
+            if len(partials) < len(chunks):
+                safe_print(f"[WARN] Summary is based on {len(partials)} of {len(chunks)} review chunks.")
+            header = "Combine these partial summaries of product reviews into one summary."
+            reviews_text = "\n---\n".join(partials)
+            if len(reviews_text) > MAX_PROMPT_CHARS:
+                safe_print(f"[WARN] Partial summaries trimmed to {MAX_PROMPT_CHARS} characters.")
+                reviews_text = reviews_text[:MAX_PROMPT_CHARS]
+
         prompt = f"""
-        Summarize the following product reviews with all their details. 
+        {header} 
         Format: 
         - Product Overall Star Rating 
         - Overall Impression 
@@ -176,62 +516,81 @@ def analyze_reviews_with_gemini(progress_start=80, progress_end=100):
         - Summary of Negative Feedbacks 
 
         Reviews Data:
-        {' '.join(formatted_reviews)} 
+        {reviews_text} 
         """
 
         output = call_gemini(prompt)
         safe_print("\n[Gemini CLI Output]:\n" + output)
 
-        for key in ["Overall Impression", "Summary of Positive Feedbacks", "Summary of Negative Feedbacks"]:
-            gemini_output[key] = ""
+        sections = {key: [] for key in
+                    ["Overall Impression", "Summary of Positive Feedbacks", "Summary of Negative Feedbacks"]}
 
-        current_key = None
-        for line in output.splitlines():
-            l = line.strip()
-            if not l:
-                continue
-            if "overall impression" in l.lower():
+        # re.split with one group interleaves: [preamble, header, body, header, body, ...]
+        parts = _RE_SECTION_HEADER.split(output)
+        pairs = list(zip(parts[1::2], parts[2::2])) or split_sections_by_keyword(output)
+        for header, body in pairs:
+            header = header.lower()
+            if "overall impression" in header:
                 current_key = "Overall Impression"
-                after_colon = re.sub(r"\*+", "", l).split(":", 1)
-                if len(after_colon) > 1 and after_colon[1].strip():
-                    gemini_output[current_key] += after_colon[1].strip() + "\n\n"
-                continue
-            elif "positive" in l.lower():
+            elif "positive" in header:
                 current_key = "Summary of Positive Feedbacks"
-                # Capture text after colon right away
-                after_colon = re.sub(r"\*+", "", l).split(":", 1)
-                if len(after_colon) > 1 and after_colon[1].strip():
-                    gemini_output[current_key] += after_colon[1].strip() + "\n\n"
-                continue
-
-            elif "negative" in l.lower():
+            else:
                 current_key = "Summary of Negative Feedbacks"
-                # Capture text after colon right away
-                after_colon = re.sub(r"\*+", "", l).split(":", 1)
-                if len(after_colon) > 1 and after_colon[1].strip():
-                    gemini_output[current_key] += after_colon[1].strip() + "\n\n"
-                continue
 
-            if current_key:
-                clean_line = re.sub(r"\*+", "", l).strip()
-                if clean_line:
-                    if current_key != "Overall Impression" and not clean_line.startswith("-"):
-                        gemini_output[current_key] += f"- {clean_line}\n\n"
-                    else:
-                        gemini_output[current_key] += clean_line + "\n\n"
-
-        # Smooth progress during Gemini analysis
-        for i in range(progress_start, progress_end + 1):
-            progress_var.set(i)
-            root.update_idletasks()
-            time.sleep(0.05)
-
-        update_result_box()
+            lines = sections[current_key]
+            for clean_line in body.replace("*", "").splitlines():
+                clean_line = clean_line.strip()
+                if not clean_line:
+                    continue
+                if current_key != "Overall Impression" and not clean_line.startswith("-"):
+                    lines.append(f"- {clean_line}\n\n")
+                else:
+                    lines.append(clean_line + "\n\n")
+
+        for key, lines in sections.items():
+            gemini_output[key] = "".join(lines)
+
+        # Smooth progress during Gemini analysis (scheduled on the Tk loop, not blocking this thread)
+        root.after(0, animate_progress, progress_start, progress_end)
+
+        root.after(0, update_result_box)
     except Exception as e:
         safe_print(f"[ERROR] Gemini analysis failed: {e}")
 
 
 # -------------------- Amazon Functions ---------------------
+# Extracts every review on the current page in one browser round-trip (textContent matches BS4 .text)
+AMAZON_REVIEWS_JS = """
+return Array.from(document.querySelectorAll("[data-hook='review']")).map(r => {
+    const text = sel => { const el = r.querySelector(sel); return el ? el.textContent.trim() : ""; };
+    return {
+        name: text("span.a-profile-name"),
+        star: text("span.a-icon-alt"),
+        date: text("span[data-hook='review-date']"),
+        body: text("span[data-hook='review-body']")
+    };
+});
+"""
+
+# Product-page rating + total ratings; textContent because span.a-icon-alt is visually hidden (empty .text)
+AMAZON_HEADER_JS = """
+const text = sel => { const el = document.querySelector(sel); return el ? el.textContent.trim() : ""; };
+return [text("span.a-icon-alt"), text("#acrCustomerReviewText")];
+"""
+
+# [title, relative product href] of every search result in one round-trip; href is "" if the card has no product link
+AMAZON_SEARCH_JS = """
+return Array.from(document.querySelectorAll("div[data-component-type='s-search-result']")).map(p => {
+    const title = p.querySelector("h2 span");
+    const link = Array.from(p.querySelectorAll("a[href]")).find(a => {
+        const href = a.getAttribute("href");
+        return href.includes("/dp/") || href.includes("/gp/product/");
+    });
+    return [title ? title.textContent.trim() : "", link ? link.getAttribute("href") : ""];
+});
+"""
+
+
 def is_on_amazon_signin_page(driver) -> bool:
     try:
         url = driver.current_url or ""
@@ -239,8 +598,8 @@ def is_on_amazon_signin_page(driver) -> bool:
         url = ""
     if "ap/signin" in url:
         return True
-    html = driver.page_source or ""
-    return any(token in html for token in ("ap_email", "ap_email_login", "ap_password"))
+    # An id lookup in the browser instead of serializing the whole DOM through page_source
+    return bool(driver.find_elements(By.CSS_SELECTOR, "#ap_email, #ap_email_login, #ap_password"))
 
 
 def amazon_sign_in(driver) -> bool:
@@ -301,23 +660,100 @@ def amazon_sign_in(driver) -> bool:
         return False
 
 
-from selenium.webdriver.common.keys import Keys  # add near your other selenium imports
+def _number_near(parent):
+    """Find the count/percentage closest to a 'positive'/'negative' label inside its parent block."""
+    # check parent block text
+    txt_candidates = []
+    if parent:
+        txt_candidates.append(parent.get_text(" ", strip=True))
+    # previous/next siblings
+    prev = parent.find_previous(string=True) if parent else None
+    nxt = parent.find_next(string=True) if parent else None
+    for t in (txt_candidates + ([prev] if prev else []) + ([nxt] if nxt else [])):
+        if not t:
+            continue
+        # look for numbers with commas or percentage like 1,234 or 56% or 78
+        m = _RE_NUM.search(t)
+        if m:
+            return m.group(1)
+    # final fallback: scan the whole parent block for any digit tokens
+    if parent:
+        m2 = _RE_NUM_ANY.search(parent.get_text(" ", strip=True))
+        if m2:
+            return m2.group(1)
+    return "N/A"
+
+
+# Clicks every (requested) aspect chip and collects each modal's innerHTML in one async round-trip.
+# Resolves with [[label, aria_id, innerHTML, pageHTML], ...]: innerHTML is "" if the modal never rendered, and
+# pageHTML is then the page as it stood right after that click (the fallback); otherwise it is "".
+# Each modal is dismissed and awaited hidden before the next click. Results are also kept on
+# window.__aspectModals so the finished aspects survive a script timeout.
+ASPECT_MODALS_JS = """
+const targets = arguments[0] ? new Set(arguments[0]) : null;
+const single = arguments[1];
+const timeoutMs = arguments[2];
+const done = arguments[arguments.length - 1];
+const out = window.__aspectModals = [];
+const rendered = el => el.getClientRects().length > 0 && el.textContent.trim() !== "";
+const waitFor = (cond, ms) => new Promise(resolve => {
+    const deadline = Date.now() + ms;
+    const tick = () => (cond() || Date.now() > deadline) ? resolve(cond()) : setTimeout(tick, 100);
+    tick();
+});
+const dismiss = el => {
+    const box = el.closest(".a-popover") || el;
+    const close = box.querySelector("[data-action='a-popover-close'], .a-button-close, button[aria-label='Close']");
+    if (close) {
+        close.click();
+    } else {
+        (document.activeElement || document.body).dispatchEvent(
+            new KeyboardEvent("keydown", {key: "Escape", code: "Escape", keyCode: 27, bubbles: true}));
+    }
+    return waitFor(() => !rendered(el), Math.min(timeoutMs, 3000));
+};
+(async () => {
+    let prevId = null;
+    for (const a of document.querySelectorAll("a[data-hook='cr-insights-aspect-link']")) {
+        const label = (a.innerText || a.getAttribute("aria-label") || "").trim();
+        if (!label || (targets && !targets.has(label.toLowerCase()))) continue;
+        const id = a.getAttribute("aria-controls");
+        try {
+            const el = id ? document.getElementById(id) : null;
+            // chips sharing one popover must show new content, not the previous aspect's counts
+            const before = el && id === prevId ? el.innerHTML : null;
+            a.scrollIntoView({block: "center"});
+            a.click();
+            const ok = el ? await waitFor(() => rendered(el) && el.innerHTML !== before, timeoutMs) : false;
+            out.push(ok ? [label, id, el.innerHTML, ""] : [label, id, "", document.documentElement.outerHTML]);
+            if (el) await dismiss(el);
+        } catch (e) {
+            out.push([label, id, "", ""]);
+        }
+        prevId = id;
+        if (targets && single) break;
+    }
+    done(out);
+})().catch(() => done(out));
+"""
 
 
-def extract_feature_ratings_and_feedback(product_url, asin, target_features=None, wait_timeout=10):
+def extract_feature_ratings_and_feedback(product_url, asin, target_features=None, wait_timeout=10,
+                                         already_loaded=False):
     """
     Clicks feature-aspect chips (Customer Review Highlights) and extracts positive/negative counts.
     By default target_features=None -> it will gather all visible aspects. If you pass a list
     (e.g. ["Quality"]) it will only click & parse those.
+    Pass already_loaded=True when the driver is already on product_url to skip reloading it.
     Returns dict: { "Quality": {"positive": "123", "negative": "45", "sentiment": "positive/negative/neutral"}, ... }
     """
+    # lower-cased once into a set; the JS side turns it into a Set for O(1) label lookups
     if target_features is not None:
-        target_features = [t.lower() for t in target_features]
-    else:
-        target_features = None
+        target_features = frozenset(t.lower() for t in target_features)
+    single_target = bool(target_features) and len(target_features) == 1
 
-    driver.get(product_url)
-    time.sleep(2)
+    if not already_loaded:
+        driver.get(product_url)
 
     # Wait for aspects to be present (if present at all)
     try:
@@ -328,93 +764,60 @@ def extract_feature_ratings_and_feedback(product_url, asin, target_features=None
         safe_print("[Amazon] No review-insight aspect links found on page.")
         return {}
 
-    # collect aspect elements
-    aspects = driver.find_elements(By.CSS_SELECTOR, "a[data-hook='cr-insights-aspect-link']")
-    safe_print(f"[Amazon] Found {len(aspects)} aspect chips on page (look for Quality etc).")
+    # open every aspect modal and grab its HTML in a single browser round-trip
+    try:
+        modals = driver.execute_async_script(
+            ASPECT_MODALS_JS,
+            list(target_features) if target_features else None,
+            single_target,
+            wait_timeout * 1000
+        ) or []
+    except Exception as e:
+        # e.g. script timeout: keep whatever aspects were finished before it
+        safe_print(f"[ERROR] Could not open all aspect chips: {e}")
+        try:
+            modals = driver.execute_script("return window.__aspectModals || [];") or []
+        except Exception:
+            return {}
+    safe_print(f"[Amazon] Opened {len(modals)} aspect chips on page (look for Quality etc).")
 
     feature_data = {}
+    page_soup = page_html = None
 
-    for a in aspects:
-        # robustly get the visible label (some chips contain extra whitespace or svg)
-        label = (a.text or a.get_attribute("aria-label") or "").strip()
-        if not label:
-            # try innerText fallback
-            label = (a.get_attribute("innerText") or "").strip()
-
-        if not label:
-            continue
-
+    for label, aria_id, modal_html, clicked_page_html in modals:
         safe_print(f"[DEBUG] Aspect label found: '{label}'")
 
-        # only process requested targets if provided
-        if target_features and label.lower() not in target_features:
-            continue
-
-        # scroll into view and click via JS to avoid overlay/obstruction
-        try:
-            driver.execute_script("arguments[0].scrollIntoView({block:'center'});", a)
-            driver.execute_script("arguments[0].click();", a)
-        except Exception as e:
-            safe_print(f"[WARN] Click via JS failed for '{label}': {e}. Trying normal click...")
-            try:
-                a.click()
-            except Exception as e2:
-                safe_print(f"[ERROR] Could not click aspect '{label}': {e2}")
-                continue
-
-        # the anchor should have aria-controls pointing to the modal/bottom-sheet id
-        aria_id = a.get_attribute("aria-controls")
-        modal_soup = None
-
-        if aria_id:
-            try:
-                safe_print(f"[Amazon] Waiting for modal/area with id '{aria_id}' to appear...")
-                modal_el = WebDriverWait(driver, wait_timeout).until(
-                    EC.visibility_of_element_located((By.ID, aria_id))
-                )
-                # read innerHTML of the modal (more targeted than whole page)
-                modal_html = modal_el.get_attribute("innerHTML")
-                modal_soup = BeautifulSoup(modal_html, "html.parser")
-            except Exception as e:
-                safe_print(f"[WARN] Modal with id {aria_id} didn't appear or wasn't visible: {e}")
-                # fallback: parse the current page
+        if modal_html:
+            modal_soup = BeautifulSoup(modal_html, HTML_PARSER)
         else:
-            safe_print(f"[WARN] Aspect '{label}' had no aria-controls; falling back to page HTML")
-
-        if modal_soup is None:
-            # fallback: parse page source (less reliable)
-            modal_soup = BeautifulSoup(driver.page_source, "html.parser")
+            if aria_id:
+                safe_print(f"[WARN] Modal with id {aria_id} didn't appear or wasn't visible")
+            else:
+                safe_print(f"[WARN] Aspect '{label}' had no aria-controls; falling back to page HTML")
+            # fallback: the whole page (less reliable) as captured right after this chip's click
+            if clicked_page_html:
+                modal_soup, modal_html = BeautifulSoup(clicked_page_html, HTML_PARSER), clicked_page_html
+            else:
+                if page_soup is None:
+                    page_soup = current_soup(driver)
+                    page_html = str(page_soup)
+                modal_soup, modal_html = page_soup, page_html
 
         # --- Robust extraction of positive/negative counts ---
         # Strategy: find nodes that mention 'positive'/'negative' (case-insensitive),
         # then look for the nearest number/percentage in the same block or adjacent spans.
-        pos_node = modal_soup.find(string=re.compile(r"positive", re.I))
-        neg_node = modal_soup.find(string=re.compile(r"negative", re.I))
+        pos_node = modal_soup.find(string=_RE_POSITIVE)
+        neg_node = modal_soup.find(string=_RE_NEGATIVE)
+
+        number_cache = {}  # the positive/negative labels often share one parent block
 
         def find_number_near(node):
             if not node:
                 return "N/A"
-            # check parent block text
-            parent = node.parent
-            txt_candidates = []
-            if parent:
-                txt_candidates.append(parent.get_text(" ", strip=True))
-            # previous/next siblings
-            prev = parent.find_previous(string=True) if parent else None
-            nxt = parent.find_next(string=True) if parent else None
-            for t in (txt_candidates + ([prev] if prev else []) + ([nxt] if nxt else [])):
-                if not t:
-                    continue
-                # look for numbers with commas or percentage like 1,234 or 56% or 78
-                m = re.search(r"(\d{1,3}(?:[,\d]{0,})%?|\d+%?)", t)
-                if m:
-                    return m.group(1)
-            # final fallback: scan the whole parent block for any digit tokens
-            if parent:
-                m2 = re.search(r"(\d[\d,]*%?)", parent.get_text(" ", strip=True))
-                if m2:
-                    return m2.group(1)
-            return "N/A"
+            key = id(node.parent)
+            if key not in number_cache:
+                number_cache[key] = _number_near(node.parent)
+            return number_cache[key]
 
         pos_count = find_number_near(pos_node)
         neg_count = find_number_near(neg_node)
@@ -422,10 +825,12 @@ def extract_feature_ratings_and_feedback(product_url, asin, target_features=None
         # Also attempt to detect whether overall sentiment for the aspect is positive/negative/neutral
         sentiment = "neutral"
         # look for an element indicating a green check or orange minus in the modal HTML
-        # (AboutAmazon mentions green check = mostly positive, orange minus = mostly negative)
-        if re.search(r'check|tick|✔|green|#067D62', str(modal_soup), re.I):
-            sentiment = "positive"
-        elif re.search(r'minus|−|–|orange|negative|#f09300', str(modal_soup), re.I):
+        # (AboutAmazon mentions green check = mostly positive, orange minus = mostly negative).
+        # One scan of the raw HTML: any positive marker wins, otherwise the first negative one counts.
+        for m in _RE_SENTIMENT.finditer(modal_html):
+            if m.lastgroup == "pos":
+                sentiment = "positive"
+                break
             sentiment = "negative"
 
         feature_data[label] = {
@@ -436,23 +841,6 @@ def extract_feature_ratings_and_feedback(product_url, asin, target_features=None
 
         safe_print(f"[Amazon] {label}: +{pos_count} | -{neg_count} | sentiment: {sentiment}")
 
-        # Try to close the modal to avoid stacking (press ESC)
-        try:
-            driver.find_element(By.TAG_NAME, "body").send_keys(Keys.ESCAPE)
-            time.sleep(0.4)
-        except:
-            # Last resort: click somewhere else
-            driver.execute_script("window.scrollBy(0, -200);")
-
-        # if user only asked for one feature (like Quality), break after it
-        if target_features:
-            # if we were passed a single feature, break after processing it
-            if len(target_features) == 1:
-                break
-
-        # small pause between clicks
-        time.sleep(0.5)
-
     return feature_data
 
 
@@ -460,16 +848,14 @@ def scrape_amazon_reviews(product_url, product_name):
     asin = extract_asin(product_url)
     if not asin:
         safe_print("[Amazon] Could not extract ASIN.")
-        return []
+        return 0
 
     # Get product details first
     driver.get(product_url)
-    time.sleep(3)
-    soup = BeautifulSoup(driver.page_source, "html.parser")
-    rating_span = soup.find("span", {"class": "a-icon-alt"})
-    rating = rating_span.get_text(strip=True).split()[0] if rating_span else "N/A"
-    reviews_span = soup.find("span", {"id": "acrCustomerReviewText"})
-    total_reviews = reviews_span.get_text(strip=True) if reviews_span else "N/A"
+    wait_ready("#acrCustomerReviewText, span.a-icon-alt, #productTitle")
+    rating_text, total_reviews = driver.execute_script(AMAZON_HEADER_JS)
+    rating = rating_text.split()[0] if rating_text else "N/A"
+    total_reviews = total_reviews or "N/A"
 
     product_rating_info["rating"] = rating
     product_rating_info["total_ratings"] = total_reviews
@@ -477,7 +863,7 @@ def scrape_amazon_reviews(product_url, product_name):
     safe_print(f"[Amazon] {product_name} | Rating: {rating}/5 | Total Ratings: {total_reviews}")
 
     # --- NEW FEATURE-WISE EXTRACTION ---
-    feature_data = extract_feature_ratings_and_feedback(product_url, asin)
+    feature_data = extract_feature_ratings_and_feedback(product_url, asin, already_loaded=True)
     feature_text = ""
     if feature_data:
         safe_print("\n=== Feature-wise Ratings & Feedback ===")
@@ -491,7 +877,7 @@ def scrape_amazon_reviews(product_url, product_name):
         gemini_output["Feature Ratings"] = ""
 
     # --- Reviews scraping ---
-    collected = []
+    collected = 0
     reviews_page_url = f"https://www.amazon.in/product-reviews/{asin}/?pageNumber=1&reviewerType=all_reviews"
 
     def navigate_to_reviews_with_stealth(url: str, max_attempts: int = 4) -> bool:
@@ -500,7 +886,6 @@ def scrape_amazon_reviews(product_url, product_name):
             try:
                 # Primary: normal navigation
                 driver.get(url)
-                time.sleep(2)
                 # Success if review list or any review block appears
                 try:
                     WebDriverWait(driver, 8).until(
@@ -517,8 +902,10 @@ def scrape_amazon_reviews(product_url, product_name):
                     pass
 
                 # Fallback 1: JS location change
+                old_html = driver.find_element(By.TAG_NAME, "html")
                 driver.execute_script("window.location.href = arguments[0];", url)
-                time.sleep(2)
+                wait_stale(old_html, 8)
+                wait_ready("[data-hook='review'], #ap_email, #ap_email_login", 6)
                 if not is_on_amazon_signin_page(driver):
                     try:
                         WebDriverWait(driver, 6).until(
@@ -531,7 +918,7 @@ def scrape_amazon_reviews(product_url, product_name):
                 # Fallback 2: open in a new tab to bypass back-forward cache guards
                 driver.execute_script("window.open(arguments[0], '_blank');", url)
                 driver.switch_to.window(driver.window_handles[-1])
-                time.sleep(2)
+                wait_ready("[data-hook='review'], #ap_email, #ap_email_login", 6)
                 if not is_on_amazon_signin_page(driver):
                     try:
                         WebDriverWait(driver, 6).until(
@@ -548,8 +935,6 @@ def scrape_amazon_reviews(product_url, product_name):
             if is_on_amazon_signin_page(driver):
                 safe_print("[Amazon] Detected login page during navigation. Re-attempting sign-in...")
                 amazon_sign_in(driver)
-                # brief wait before next loop
-                time.sleep(2)
         return False
 
     # Try to reach reviews page using robust navigator
@@ -570,64 +955,112 @@ def scrape_amazon_reviews(product_url, product_name):
             except Exception:
                 pass
             # Give user time to complete any manual checks
-            for i in range(30):
-                if not is_on_amazon_signin_page(driver):
-                    break
-                time.sleep(2)
+            try:
+                WebDriverWait(driver, 60, poll_frequency=2).until(lambda d: not is_on_amazon_signin_page(d))
+            except Exception:
+                pass
         safe_print("[Amazon] Reloading reviews page after login...")
         navigate_to_reviews_with_stealth(reviews_page_url)
 
-    page_count = 1
-    while page_count <= MAX_PAGES:
-        safe_print(f"[Amazon] Page {page_count}")
-        try:
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
-        except Exception as e:
-            safe_print(f"[WARN] Scrolling failed: {e}")
+    with ReviewParquetWriter() as parquet, \
+            open(CSV_FILE, "w", newline="", encoding="utf-8-sig", buffering=1 << 20) as f:
+        writer = review_csv_writer(f)
+        page_count = 1
+        while page_count <= MAX_PAGES:
+            safe_print(f"[Amazon] Page {page_count}")
+            try:
+                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                wait_ready("[data-hook='review']")
+            except Exception as e:
+                safe_print(f"[WARN] Scrolling failed: {e}")
 
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        review_blocks = soup.find_all(attrs={"data-hook": "review"})
-        if not review_blocks:
-            break
+            rows = driver.execute_script(AMAZON_REVIEWS_JS) or []
+            if not rows:
+                break
 
-        safe_print(f"Found {len(review_blocks)} reviews on this page")
-        for review in review_blocks:
-            collected.append({
+            safe_print(f"Found {len(rows)} reviews on this page")
+
+            # Start loading the next page before writing this one, so the disk write overlaps the browser load
+            next_links = driver.find_elements(By.CSS_SELECTOR, "li.a-last:not(.a-disabled) a")
+            if next_links:
+                first_review_elem = driver.find_element(By.CSS_SELECTOR, "[data-hook='review']")
+                time.sleep(PAGE_THROTTLE)
+                next_links[0].click()
+
+            page_rows = [{
                 "product_name": product_name,
                 "overall_rating": rating,
                 "total_ratings": total_reviews,
-                "reviewer_name": safe_text(review.find("span", {"class": "a-profile-name"})) or "Anonymous",
-                "star_rating": safe_text(review.find("span", {"class": "a-icon-alt"})) or "N/A",
-                "review_date": safe_text(review.find("span", {"data-hook": "review-date"})) or "N/A",
-                "review_body": safe_text(review.find("span", {"data-hook": "review-body"})) or "No Content"
-            })
-
-        # Go to next page if available
-        next_li = soup.find("li", {"class": "a-last"})
-        if next_li and next_li.find("a"):
-            driver.find_element(By.CSS_SELECTOR, "li.a-last a").click()
-            time.sleep(3)
+                "reviewer_name": row["name"] or "Anonymous",
+                "star_rating": row["star"] or "N/A",
+                "review_date": row["date"] or "N/A",
+                "review_body": row["body"] or "No Content"
+            } for row in rows]
+            writer.writerows(page_rows)
+            parquet.write_page(page_rows)
+            collected += len(rows)
+
+            if not next_links:
+                break
+            wait_stale(first_review_elem)
+            wait_ready("[data-hook='review']")
             page_count += 1
-        else:
-            break
 
     if collected:
-        pd.DataFrame(collected).to_csv(CSV_FILE, index=False, encoding="utf-8-sig")
-        safe_print(f"[Amazon] Scraped {len(collected)} reviews saved to {CSV_FILE}")
+        safe_print(f"[Amazon] Scraped {collected} reviews saved to {CSV_FILE}")
     else:
         safe_print("[Amazon] No reviews found.")
     return collected
 
 
 # -------------------- Flipkart Functions ---------------------
+# Same single round-trip extraction for Flipkart review cards; body mirrors get_text(" ", strip=True)
+FLIPKART_REVIEWS_JS = """
+return Array.from(document.querySelectorAll("div.EKFha-")).map(r => {
+    const text = el => el ? el.textContent.trim() : "";
+    const dates = r.querySelectorAll("div.gHqwa8 p._2NsDsF");
+    const bodyEl = r.querySelector("div[class^='ZmyHeo'], div[class*=' ZmyHeo']");
+    let body = null;
+    if (bodyEl) {
+        const parts = [];
+        const walker = document.createTreeWalker(bodyEl, NodeFilter.SHOW_TEXT);
+        while (walker.nextNode()) {
+            const t = walker.currentNode.nodeValue.trim();
+            if (t) parts.push(t);
+        }
+        body = parts.join(" ");
+    }
+    return {
+        star: text(r.querySelector("div[class^='XQDdHH'], div[class*=' XQDdHH']")),
+        name: text(r.querySelector("p._2NsDsF.AwS1CA")),
+        date: dates.length ? text(dates[dates.length - 1]) : "",
+        body: body
+    };
+});
+"""
+
+
+# Overall rating + first "Ratings" span, found by the browser's native XPath engine (no page_source transfer)
+FLIPKART_HEADER_JS = """
+const text = el => el ? el.textContent.trim() : "";
+const total = document.evaluate("//span[contains(., 'Ratings')]", document, null,
+    XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+return [text(document.querySelector("div.ipqd2A")), text(total)];
+"""
+
+# [title, href] of every search-result card in one round-trip instead of two get_attribute calls per card
+FLIPKART_SEARCH_JS = """
+return Array.from(document.querySelectorAll("a.wjcEIp")).map(a => [a.title || "", a.href || ""]);
+"""
+
+
 def scrape_flipkart_category_ratings(driver, product_url):
     """Extract Flipkart category ratings + positive/negative feedback like Sound Quality, Bass, etc."""
     safe_print(f"[Flipkart] Opening product page for feature ratings: {product_url}")
     driver.get(product_url)
-    time.sleep(3)
+    wait_ready("a[href*='/product-reviews/']")
 
-    soup = BeautifulSoup(driver.page_source, "html.parser")
+    soup = current_soup(driver, FLIPKART_LINKS_STRAINER)
     anchors = soup.find_all("a", href=True)
 
     category_links = {}
@@ -642,16 +1075,16 @@ def scrape_flipkart_category_ratings(driver, product_url):
             label = div_label.get_text(strip=True)
             if label.lower() == "overall":  # SKIP "Overall"
                 continue
-            if not re.match(r"^(?:[0-9]+|Next)$", label, re.I):
+            if not _RE_PAGINATION_LABEL.match(label):
                 category_links[label] = "https://www.flipkart.com" + href
             continue
 
-        span_label = a.find("span", class_=lambda x: x and "AgRA+X" in x)
+        span_label = a.select_one("span[class*='AgRA+X']")
         if span_label:
             label = span_label.get_text(strip=True)
             if label.lower() == "overall":  # SKIP "Overall"
                 continue
-            if not re.match(r"^(?:[0-9]+|Next)$", label, re.I):
+            if not _RE_PAGINATION_LABEL.match(label):
                 category_links[label] = "https://www.flipkart.com" + href
 
     safe_print(f"[Flipkart] Found {len(category_links)} feature/category links.")
@@ -664,7 +1097,7 @@ def scrape_flipkart_category_ratings(driver, product_url):
             WebDriverWait(driver, 8).until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, "text._2DdnFS"))
             )
-            soup = BeautifulSoup(driver.page_source, "html.parser")
+            soup = current_soup(driver, FLIPKART_CATEGORY_STRAINER)
             rating_tag = soup.find("text", class_="_2DdnFS")
             rating_val = rating_tag.get_text(strip=True) if rating_tag else "N/A"
 
@@ -688,7 +1121,7 @@ def scrape_flipkart_category_ratings(driver, product_url):
 
 # -------------------- Flipkart Functions ---------------------
 def scrape_flipkart_reviews(driver, product_name):
-    collected = []
+    collected = 0
     try:
         try:
             view_all = WebDriverWait(driver, 5).until(
@@ -696,21 +1129,14 @@ def scrape_flipkart_reviews(driver, product_name):
                     (By.XPATH, '//*[@id="container"]//span[contains(text(),"All") and contains(text(),"reviews")]'))
             )
             view_all.click()
-            time.sleep(2)
+            wait_ready("div.EKFha-")
             safe_print("[Flipkart] Clicked 'All reviews' button.")
         except:
             safe_print("[Flipkart] No 'All reviews' button found.")
 
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        rating_tag = soup.find("div", class_="ipqd2A")
-        total_tag = None
-        for s in soup.find_all("span"):
-            if "Ratings" in s.text:
-                total_tag = s
-                break
-
-        rating = safe_text(rating_tag) or "N/A"
-        total_reviews = safe_text(total_tag) or "N/A"
+        rating, total_reviews = driver.execute_script(FLIPKART_HEADER_JS)
+        rating = rating or "N/A"
+        total_reviews = total_reviews or "N/A"
 
         product_rating_info["rating"] = rating
         product_rating_info["total_ratings"] = total_reviews
@@ -728,58 +1154,51 @@ def scrape_flipkart_reviews(driver, product_name):
                 safe_print(line)
                 feature_text += line + "\n"
         gemini_output["Feature Ratings"] = feature_text
-        page_count = 1
-        while page_count <= MAX_PAGES:
-            safe_print(f"[Flipkart] Page {page_count}")
-            soup = BeautifulSoup(driver.page_source, "html.parser")
-            review_blocks = soup.find_all("div", class_="EKFha-")
-            if not review_blocks:
-                break
-
-            for review in review_blocks:
-                star_rating_tag = review.find("div", class_=re.compile(r"^XQDdHH"))
-                star_rating = safe_text(star_rating_tag) or "N/A"
-                reviewer_name_tag = review.find("p", class_="_2NsDsF AwS1CA")
-                reviewer_name = safe_text(reviewer_name_tag) or "Anonymous"
-                date_tag = None
-                user_info_container = review.find('div', class_='gHqwa8')
-                if user_info_container:
-                    date_tags = user_info_container.find_all("p", class_="_2NsDsF")
-                    if date_tags:
-                        date_tag = date_tags[-1]
-                review_date = safe_text(date_tag) or "N/A"
-                review_text_tag = review.find("div", {"class": re.compile(r"^ZmyHeo")})
-                review_text = review_text_tag.get_text(separator=" ", strip=True).replace("READ MORE",
-                                                                                          "").strip() if review_text_tag else "N/A"
-
-                collected.append({
-                    "product_name": product_name,
-                    "overall_rating": rating,
-                    "total_ratings": total_reviews,
-                    "reviewer_name": reviewer_name,
-                    "star_rating": star_rating,
-                    "review_date": review_date,
-                    "review_body": review_text
-                })
+        with ReviewParquetWriter() as parquet, \
+                open(CSV_FILE, "w", newline="", encoding="utf-8-sig", buffering=1 << 20) as f:
+            writer = review_csv_writer(f)
+            page_count = 1
+            while page_count <= MAX_PAGES:
+                safe_print(f"[Flipkart] Page {page_count}")
+                rows = driver.execute_script(FLIPKART_REVIEWS_JS) or []
+                if not rows:
+                    break
 
-            progress_page = 50 * page_count / MAX_PAGES
-            progress_var.set(progress_page)
-            root.update_idletasks()
-            time.sleep(0.1)
+                page_rows = []
+                for row in rows:
+                    review_text = row["body"].replace("READ MORE", "").strip() if row["body"] is not None else "N/A"
+
+                    page_rows.append({
+                        "product_name": product_name,
+                        "overall_rating": rating,
+                        "total_ratings": total_reviews,
+                        "reviewer_name": row["name"] or "Anonymous",
+                        "star_rating": row["star"] or "N/A",
+                        "review_date": row["date"] or "N/A",
+                        "review_body": review_text
+                    })
+                writer.writerows(page_rows)
+                parquet.write_page(page_rows)
+                collected += len(page_rows)
+
+                progress_page = 50 * page_count / MAX_PAGES
+                root.after(0, progress_var.set, progress_page)
 
-            try:
-                next_btn = driver.find_element(By.XPATH, "//span[text()='Next']")
-                driver.execute_script("arguments[0].click();", next_btn)
-                time.sleep(1)
-                page_count += 1
-            except:
-                break
+                try:
+                    next_btn = driver.find_element(By.XPATH, "//span[text()='Next']")
+                    first_review_elem = driver.find_element(By.CSS_SELECTOR, "div.EKFha-")
+                    time.sleep(PAGE_THROTTLE)
+                    driver.execute_script("arguments[0].click();", next_btn)
+                    wait_stale(first_review_elem)
+                    wait_ready("div.EKFha-")
+                    page_count += 1
+                except:
+                    break
     except:
         pass
 
     if collected:
-        pd.DataFrame(collected).to_csv(CSV_FILE, index=False, encoding="utf-8-sig")
-        safe_print(f"[Flipkart] Scraped {len(collected)} reviews saved to {CSV_FILE}")
+        safe_print(f"[Flipkart] Scraped {collected} reviews saved to {CSV_FILE}")
     else:
         safe_print("[Flipkart] No reviews found.")
 
@@ -793,6 +1212,9 @@ def update_result_box(*args):
     Updates the output box based on the selected option in the dropdown.
     Shows or hides the chat frame as needed.
     """
+    # Deliver already-logged lines now, so the clear below removes them instead of a later drain
+    # appending them under the rendered result
+    flush_log_queue()
     option = option_var.get()
 
     # Hide both buttons initially
@@ -847,7 +1269,8 @@ def update_result_box(*args):
             # --- Get product name ---
             product_name_text = ""
             try:
-                df = pd.read_csv(CSV_FILE, encoding="utf-8-sig")
+                import pandas as pd  # only here: update_result_box also runs at startup, before mainloop
+                df = pd.read_csv(CSV_FILE, encoding="utf-8-sig", usecols=lambda c: c == "product_name", nrows=1)
                 if "product_name" in df.columns and not df["product_name"].empty:
                     product_name_text = df["product_name"].iloc[0]
             except Exception:
@@ -915,8 +1338,8 @@ def _animate_chat_progress():
         elif chat_progress_value <= 70:
             chat_progress_value = 70
             chat_progress_direction = 1
+        # Runs inside the Tk loop, which repaints on its own; no forced update_idletasks() per tick
         progress_var.set(chat_progress_value)
-        root.update_idletasks()
     except Exception:
         pass
     # Schedule next tick
@@ -929,16 +1352,12 @@ def _run_chat_call(prompt: str):
         response = call_gemini(prompt)
     except Exception as e:
         response = f"[ERROR] Chat failed: {e}"
-    # Stop animation and finalize progress
+    # Stop animation; the final progress value is set with the response on the UI thread
     chat_progress_running = False
-    try:
-        progress_var.set(100)
-        root.update_idletasks()
-    except Exception:
-        pass
 
     # Append response in UI thread
     def _append():
+        progress_var.set(100)
         output_box.config(state="normal")
         output_box.insert(tk.END, f"Gemini: {response}\n")
         output_box.config(state="disabled")
@@ -1011,38 +1430,38 @@ def save_executive_summary():
         messagebox.showerror("Error", f"Failed to save summary:\n{e}")
 
 
-# -------------------- Submit Thread ---------------------
-def run_scraper_thread():
-    threading.Thread(target=submit_scraper, daemon=True).start()
+# -------------------- Chrome Driver ---------------------
+# Requests cancelled at the network layer: images, web fonts and tracking beacons (stylesheets are still needed)
+BLOCKED_URL_PATTERNS = [
+    "*.jpg", "*.jpeg", "*.png", "*.webp", "*.gif", "*.svg",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*/analytics*", "*/beacon*",
+]
 
 
-def submit_scraper():
-    global driver
-    user_product = product_entry.get().strip()
-    platform = platform_var.get()
-
-    if not user_product:
-        messagebox.showerror("Input Error", "Please enter a product name")
-        return
-
-    # Check network connectivity
-    safe_print("[INFO] Checking network connectivity...")
+def block_heavy_requests(drv):
+    """Block BLOCKED_URL_PATTERNS via CDP so those bytes are never fetched, including CSS background images."""
     try:
-        import urllib.request
-        urllib.request.urlopen('https://www.google.com', timeout=5)
-        safe_print("[INFO] Network connectivity confirmed.")
+        drv.execute_cdp_cmd("Network.enable", {})
+        drv.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
     except Exception as e:
-        safe_print(f"[WARNING] Network connectivity issue detected: {e}")
-        safe_print("[INFO] This may cause Chrome driver initialization to fail.")
-        safe_print("[INFO] Please ensure you have a stable internet connection.")
+        safe_print(f"[WARN] Could not enable request blocking: {e}")
 
-    output_box.config(state="normal")
-    output_box.delete(1.0, tk.END)
-    output_box.config(state="disabled")
 
-    progress_var.set(0)
-    safe_print(f"[INFO] Searching for '{user_product}' on {platform}...")
+def apply_fast_load_options(opts):
+    """Skip images and web fonts and return from driver.get at DOMContentLoaded; we only read HTML/text."""
+    opts.page_load_strategy = "eager"
+    # Stylesheets stay enabled: visibility waits, clicks and the aspect modals depend on computed layout
+    opts.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.fonts": 2,
+    })
+    opts.add_argument("--blink-settings=imagesEnabled=false")
+
 
+def _create_driver():
+    # Deferred to first submit: importing undetected_chromedriver is slow and not needed to show the UI
+    import undetected_chromedriver as uc
     options = uc.ChromeOptions()
     if HEADLESS:
         options.add_argument("--headless=new")
@@ -1055,6 +1474,7 @@ def submit_scraper():
         "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
         "(KHTML, like Gecko) Chrome/139.0.0.0 Safari/537.36"
     )
+    apply_fast_load_options(options)
 
     # Use a persistent user data dir to keep Amazon session cookies
     try:
@@ -1067,9 +1487,9 @@ def submit_scraper():
 
     try:
         safe_print("[INFO] Initializing Chrome driver...")
-        driver = uc.Chrome(options=options)
-        driver.set_page_load_timeout(600)  # was 300, increase to 10 minutes
-        driver.set_script_timeout(300)  # add this for JS execution
+        new_driver = uc.Chrome(options=options)
+        new_driver.set_page_load_timeout(600)  # was 300, increase to 10 minutes
+        new_driver.set_script_timeout(300)  # add this for JS execution
         safe_print("[INFO] Chrome driver initialized successfully.")
     except Exception as e:
         safe_print(f"[ERROR] Failed to initialize undetected Chrome driver: {e}")
@@ -1092,28 +1512,29 @@ def submit_scraper():
                 "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
                 "(KHTML, like Gecko) Chrome/139.0.0.0 Safari/537.36"
             )
+            apply_fast_load_options(chrome_options)
 
             # Try to use regular Chrome driver
-            driver = webdriver.Chrome(options=chrome_options)
-            driver.set_page_load_timeout(600)
-            driver.set_script_timeout(300)
+            new_driver = webdriver.Chrome(options=chrome_options)
+            new_driver.set_page_load_timeout(600)
+            new_driver.set_script_timeout(300)
             safe_print("[INFO] Fallback Chrome driver initialized successfully.")
 
         except Exception as fallback_error:
             safe_print(f"[ERROR] Fallback Chrome driver also failed: {fallback_error}")
             safe_print("[INFO] This might be due to network connectivity issues.")
             safe_print("[INFO] Please check your internet connection and try again.")
-            messagebox.showerror("Chrome Driver Error",
-                                 f"Failed to initialize Chrome driver.\n\n"
-                                 f"Primary Error: {e}\n"
-                                 f"Fallback Error: {fallback_error}\n\n"
-                                 f"This is usually due to:\n"
-                                 f"1. No internet connection\n"
-                                 f"2. Firewall blocking the connection\n"
-                                 f"3. Chrome browser not installed\n"
-                                 f"4. ChromeDriver not in PATH\n\n"
-                                 f"Please check your internet connection and try again.")
-            return
+            root.after(0, messagebox.showerror, "Chrome Driver Error",
+                       f"Failed to initialize Chrome driver.\n\n"
+                       f"Primary Error: {e}\n"
+                       f"Fallback Error: {fallback_error}\n\n"
+                       f"This is usually due to:\n"
+                       f"1. No internet connection\n"
+                       f"2. Firewall blocking the connection\n"
+                       f"3. Chrome browser not installed\n"
+                       f"4. ChromeDriver not in PATH\n\n"
+                       f"Please check your internet connection and try again.")
+            return None
     # Inject stealth tweaks to reduce bot detection
     try:
         stealth_js = """
@@ -1131,10 +1552,135 @@ def submit_scraper():
           parameters.name === 'notifications' ? Promise.resolve({ state: Notification.permission }) : originalQuery(parameters)
         );
         """
-        driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': stealth_js})
+        new_driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': stealth_js})
     except Exception:
         pass
-    collected_reviews = []
+
+    block_heavy_requests(new_driver)
+    return new_driver
+
+
+def get_driver():
+    """Return the shared Chrome driver, creating it on first use or if the previous browser died."""
+    global driver
+    with _driver_lock:
+        if driver is not None:
+            try:
+                _ = driver.window_handles  # raises if the browser was closed
+                return driver
+            except Exception:
+                safe_print("[INFO] Previous browser session is gone, starting a new one...")
+                try:
+                    driver.quit()  # still stops chromedriver and any surviving Chrome process
+                except Exception:
+                    pass
+                driver = None
+        driver = _create_driver()
+        return driver
+
+
+# Sites whose local/session storage is wiped between runs (cookies are cleared browser-wide)
+SCRAPED_ORIGINS = ["https://www.amazon.in", "https://www.flipkart.com"]
+
+
+def reset_driver():
+    """Clear per-run state (extra tabs, cookies, site storage) so the browser can be reused by the next submit."""
+    if driver is None:
+        return
+    try:
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        # A persistent profile exists to keep the Amazon login, so only wipe session state without one.
+        # delete_all_cookies() would only cover the current page's domain; CDP clears every site.
+        if not CONFIG.get("chrome_user_data_dir"):
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            for origin in SCRAPED_ORIGINS:
+                driver.execute_cdp_cmd("Storage.clearDataForOrigin", {
+                    "origin": origin,
+                    "storageTypes": "local_storage,session_storage,indexeddb",
+                })
+        driver.get("about:blank")
+    except Exception as e:
+        safe_print(f"[WARN] Could not reset browser session: {e}")
+
+
+def quit_driver():
+    global driver
+    # Same lock as get_driver(), so a driver being created is not quit (or leaked) halfway
+    with _driver_lock:
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+            driver = None
+
+
+atexit.register(quit_driver)
+
+
+def on_close():
+    """Destroy the window first, then close the reused browser unless a run is still using it."""
+    root.destroy()
+    # An active worker still owns the driver; the atexit hook quits it once the app exits
+    if not _run_lock.locked():
+        quit_driver()
+
+
+# -------------------- Submit Thread ---------------------
+def run_scraper_thread():
+    # Read and reset all widgets here on the Tk thread; the worker only logs via safe_print / root.after
+    if _run_lock.locked():
+        return
+    user_product = product_entry.get().strip()
+    platform = platform_var.get()
+
+    if not user_product:
+        messagebox.showerror("Input Error", "Please enter a product name")
+        return
+
+    flush_log_queue()
+    output_box.config(state="normal")
+    output_box.delete(1.0, tk.END)
+    output_box.config(state="disabled")
+    progress_var.set(0)
+
+    # One run at a time: a second worker would share the browser, and reset_driver() would pull it away
+    submit_btn.config(state="disabled")
+    threading.Thread(target=_run_submit, args=(user_product, platform), daemon=True).start()
+
+
+def _run_submit(user_product, platform):
+    with _run_lock:
+        try:
+            submit_scraper(user_product, platform)
+        finally:
+            root.after(0, lambda: submit_btn.config(state="normal"))
+
+
+def submit_scraper(user_product, platform):
+    global driver
+    # Check network connectivity
+    safe_print("[INFO] Checking network connectivity...")
+    try:
+        import urllib.request
+        urllib.request.urlopen('https://www.google.com', timeout=5)
+        safe_print("[INFO] Network connectivity confirmed.")
+    except Exception as e:
+        safe_print(f"[WARNING] Network connectivity issue detected: {e}")
+        safe_print("[INFO] This may cause Chrome driver initialization to fail.")
+        safe_print("[INFO] Please ensure you have a stable internet connection.")
+
+    safe_print(f"[INFO] Searching for '{user_product}' on {platform}...")
+
+    driver = get_driver()
+    if driver is None:
+        return
+
+    collected_reviews = 0
 
     try:
         if platform == "Amazon":
@@ -1145,33 +1691,24 @@ def submit_scraper():
                     EC.element_to_be_clickable((By.XPATH, "//span/span/button"))
                 )
                 continue_button.click()
-                time.sleep(2)
+                wait_stale(continue_button, 5)
                 safe_print("[Amazon] Clicked continue button (location prompt).")
             except:
                 safe_print("[Amazon] No continue button found, proceeding directly.")
-            time.sleep(3)
-            search_box = driver.find_element(By.ID, "twotabsearchtextbox")
+            search_box = wait_ready("#twotabsearchtextbox", 10) or driver.find_element(By.ID, "twotabsearchtextbox")
             search_box.send_keys(user_product)
             search_box.submit()
-            time.sleep(5)
+            wait_ready("div[data-component-type='s-search-result']", 10)
 
-            soup = BeautifulSoup(driver.page_source, "html.parser")
-            products = soup.find_all("div", {"data-component-type": "s-search-result"})
+            candidates = [(title, href) for title, href in driver.execute_script(AMAZON_SEARCH_JS) or [] if title]
 
             matched_url = None
             matched_title = None
-            for product in products:
-                title_tag = product.find("h2")
-                if title_tag:
-                    title_span = title_tag.find("span")
-                    if title_span:
-                        product_title = title_span.get_text(strip=True)
-                        if clean_text(user_product) in clean_text(product_title):
-                            matched_title = product_title
-                            link_tag = product.find("a", href=re.compile(r"/(?:dp|gp/product)/"))
-                            if link_tag and "href" in link_tag.attrs:
-                                matched_url = "https://www.amazon.in" + link_tag["href"].split("?")[0]
-                                break
+            for idx in matching_title_indexes([title for title, _ in candidates], user_product):
+                matched_title, href = candidates[idx]
+                if href:
+                    matched_url = "https://www.amazon.in" + href.split("?")[0]
+                    break
             if matched_url:
                 safe_print(f"[Amazon] Product matched: {matched_title}")
                 collected_reviews = scrape_amazon_reviews(matched_url, matched_title)
@@ -1179,25 +1716,20 @@ def submit_scraper():
                 safe_print("[Amazon] No product matched the input.")
         else:
             driver.get(f"https://www.flipkart.com/search?q={user_product}")
-            time.sleep(3)
+            wait_ready("a.wjcEIp")
             try:
                 close_btn = driver.find_element(By.XPATH, "//button[contains(text(),'✕')]")
                 close_btn.click()
-                time.sleep(1)
             except:
                 pass
-            product_elements = driver.find_elements(By.CSS_SELECTOR, "a.wjcEIp")
+            titled = [(title, href) for title, href in driver.execute_script(FLIPKART_SEARCH_JS) or [] if title]
             matched_title, matched_href = None, None
-            for elem in product_elements:
-                title = elem.get_attribute("title") or ""
-                if title and clean_text(user_product) in clean_text(title):
-                    matched_title = title
-                    matched_href = elem.get_attribute("href")
-                    break
+            matches = matching_title_indexes([title for title, _ in titled], user_product)
+            if matches:
+                matched_title, matched_href = titled[matches[0]]
             if matched_title and matched_href:
                 safe_print(f"[Flipkart] Product matched: {matched_title}")
                 driver.get(matched_href)
-                time.sleep(2)
                 collected_reviews = scrape_flipkart_reviews(driver, matched_title)
             else:
                 safe_print("[Flipkart] No product matched the input.")
@@ -1206,12 +1738,12 @@ def submit_scraper():
         try:
             if driver and is_on_amazon_signin_page(driver) and not HEADLESS:
                 safe_print("[Amazon] Still on login at shutdown. Pausing 20s for manual completion...")
-                time.sleep(20)
+                WebDriverWait(driver, 20, poll_frequency=2).until(lambda d: not is_on_amazon_signin_page(d))
         except Exception:
             pass
         if driver:
-            driver.quit()
-            safe_print("[INFO] Browser closed.")
+            reset_driver()
+            safe_print("[INFO] Browser session reset for reuse.")
 
     if collected_reviews:
         analyze_reviews_with_gemini()
@@ -1394,4 +1926,6 @@ style.map('Custom.TCombobox',
 option_var.set("Executive Summary")  # Set initial value
 option_var.trace("w", update_result_box)
 
+root.protocol("WM_DELETE_WINDOW", on_close)
+root.after(100, drain_log_queue)
 root.mainloop()